@@ -0,0 +1,21 @@
+"""
+Compiled per-reading anomaly check.
+Uses Numba when it is installed and falls back to plain Python otherwise.
+"""
+from _jit import njit
+
+
+@njit(cache=True)
+def check(value, tmin, tmax, mean, std, k):
+    """
+    Return True if a value breaks the threshold rules or lies outside mean ± k*std.
+    
+    Pass std=0.0 to skip the statistical check (e.g. not enough history).
+    """
+    if value < tmin or value > tmax:
+        return True
+    return std >= 1e-6 and (value < mean - k * std or value > mean + k * std)
+
+
+# Compile at import so the first reading doesn't pay the JIT cost
+check(0.0, -1.0, 1.0, 0.0, 1.0, 3.0)
@@ -0,0 +1,12 @@
+"""
+Shared numba.njit import for the compiled kernels (_anomaly_jit, _simulator_jit).
+Numba is optional; without it njit is a no-op and the kernels run as plain Python.
+"""
+try:
+    from numba import njit
+except ImportError:  # Numba is optional
+    def njit(*args, **kwargs):
+        """No-op replacement for numba.njit."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
@@ -0,0 +1,28 @@
+"""
+Compiled per-reading value generator for the simulator.
+Uses Numba when it is installed and falls back to plain Python otherwise.
+"""
+import math
+
+from _jit import njit
+
+
+@njit(cache=True, fastmath=True)
+def gen(t, base, var, lo, hi, p_anom, gauss, u1, u2, u3):
+    """
+    Return one simulated value at time step t.
+    
+    gauss is a standard normal draw and u1..u3 are uniform [0, 1) draws:
+    u1 decides whether to inject an anomaly, u2 spike vs drop, u3 its size.
+    """
+    value = base + math.sin(t * 0.1) * var * 0.5 + gauss * var * 0.2
+    if u1 < p_anom:
+        if u2 < 0.5:
+            value += var * (3.0 + 2.0 * u3)  # Spike
+        else:
+            value -= var * (2.0 + 2.0 * u3)  # Drop
+    return min(max(value, lo), hi)
+
+
+# Compile at import so the first reading doesn't pay the JIT cost
+gen(1, 37.5, 1.5, 33.5, 41.5, 0.05, 0.0, 0.5, 0.5, 0.5)
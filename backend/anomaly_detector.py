@@ -2,14 +2,21 @@
 Anomaly detection logic for sensor readings.
 Uses rolling mean ± 3 standard deviations and threshold rules.
 """
+import math
 import numpy as np
 from typing import List, Dict, Tuple, Optional
-from collections import deque
+
+from _anomaly_jit import check
+from readings import TAG_NAMES, TAG_ID
 
 
 class AnomalyDetector:
     """Detects anomalies using rolling statistics and threshold rules."""
     
+    # Tags with preallocated rolling-window storage, and their row ids
+    TAGS = TAG_NAMES
+    TAG_ID = TAG_ID
+    
     # Threshold rules for each tag
     THRESHOLD_RULES = {
         'fermenter_temp': {'min': 35.0, 'max': 45.0},  # 45°C is anomaly threshold
@@ -17,6 +24,10 @@ class AnomalyDetector:
         'agitator_rpm': {'min': 250.0, 'max': 650.0},
     }
     
+    # Recompute running stats from the window after this many updates to
+    # bound floating-point drift from the incremental add/remove updates
+    RESYNC_INTERVAL = 10_000
+    
     def __init__(self, window_size=50, std_threshold=3.0):
         """
         Initialize the anomaly detector.
@@ -27,13 +38,85 @@ class AnomalyDetector:
         """
         self.window_size = window_size
         self.std_threshold = std_threshold
-        self.history = {}  # tag -> deque of values
+        
+        # Rolling window state, one row/element per tag (structure of arrays)
+        n_tags = len(self.TAGS)
+        self.tag_idx = dict(self.TAG_ID)
+        self.buf = np.empty((n_tags, window_size), dtype=np.float64)  # ring buffers
+        self.n = np.zeros(n_tags, dtype=np.int32)                     # values in window
+        self.widx = np.zeros(n_tags, dtype=np.int32)                  # next write position
+        self.mean = np.zeros(n_tags, dtype=np.float64)                # running mean
+        self.M2 = np.zeros(n_tags, dtype=np.float64)                  # sum of squared deviations
+        self.updates = np.zeros(n_tags, dtype=np.int64)               # updates since resync
+        
+        # Threshold rules indexed by tag row (±inf where a tag has no rule)
+        self.thr_min = np.array([self.THRESHOLD_RULES.get(tag, {}).get('min', -np.inf) for tag in self.TAGS])
+        self.thr_max = np.array([self.THRESHOLD_RULES.get(tag, {}).get('max', np.inf) for tag in self.TAGS])
+    
+    def _index(self, tag: str) -> int:
+        """Return the row for a tag, adding one if the tag is new."""
+        i = self.tag_idx.get(tag)
+        if i is None:
+            i = self.tag_idx[tag] = len(self.tag_idx)
+            self.buf = np.vstack((self.buf, np.empty((1, self.window_size))))
+            self.n = np.append(self.n, np.int32(0))
+            self.widx = np.append(self.widx, np.int32(0))
+            self.mean = np.append(self.mean, 0.0)
+            self.M2 = np.append(self.M2, 0.0)
+            self.updates = np.append(self.updates, np.int64(0))
+            rules = self.THRESHOLD_RULES.get(tag, {})
+            self.thr_min = np.append(self.thr_min, rules.get('min', -np.inf))
+            self.thr_max = np.append(self.thr_max, rules.get('max', np.inf))
+        return i
     
     def add_reading(self, tag: str, value: float):
-        """Add a reading to the historical data."""
-        if tag not in self.history:
-            self.history[tag] = deque(maxlen=self.window_size)
-        self.history[tag].append(value)
+        """
+        Add a reading to the historical data.
+        
+        Keeps the rolling mean and sum of squared deviations (M2) up to date
+        with Welford's algorithm, removing the value that falls out of the
+        window so each update is O(1).
+        """
+        i = self._index(tag)
+        idx = int(self.widx[i])
+        n = int(self.n[i])
+        mean = float(self.mean[i])
+        m2 = float(self.M2[i])
+        
+        if n == self.window_size:
+            # Window full: remove the oldest value (reverse Welford)
+            old = float(self.buf[i, idx])
+            if n == 1:
+                n, mean, m2 = 0, 0.0, 0.0
+            else:
+                prev_mean = mean
+                mean -= (old - mean) / (n - 1)
+                m2 -= (old - mean) * (old - prev_mean)
+                n -= 1
+        
+        # Welford add
+        n += 1
+        delta = value - mean
+        mean += delta / n
+        m2 += delta * (value - mean)
+        
+        self.buf[i, idx] = value
+        self.widx[i] = (idx + 1) % self.window_size
+        self.n[i] = n
+        self.mean[i] = mean
+        self.M2[i] = m2 if m2 > 0.0 else 0.0
+        
+        self.updates[i] += 1
+        if self.updates[i] >= self.RESYNC_INTERVAL:
+            self._resync(i)
+    
+    def _resync(self, i: int):
+        """Recompute mean and M2 exactly from the values in a tag's window."""
+        window = self.buf[i, :self.n[i]]
+        mean = float(window.mean())
+        self.mean[i] = mean
+        self.M2[i] = float(np.square(window - mean).sum())
+        self.updates[i] = 0
     
     def detect_anomaly(self, tag: str, value: float) -> bool:
         """
@@ -50,33 +133,27 @@ class AnomalyDetector:
         Returns:
             True if anomaly detected, False otherwise
         """
-        # Method 1: Check threshold rules first
-        if tag in self.THRESHOLD_RULES:
-            rules = self.THRESHOLD_RULES[tag]
-            if value < rules['min'] or value > rules['max']:
-                return True
-        
-        # Need enough history for statistical analysis
-        if tag not in self.history or len(self.history[tag]) < 10:
-            return False
+        i = self.tag_idx.get(tag)
+        if i is None:
+            # Unknown tag with no history: only the threshold rules can apply
+            rules = self.THRESHOLD_RULES.get(tag, {})
+            tmin, tmax = rules.get('min', -math.inf), rules.get('max', math.inf)
+            return check(value, tmin, tmax, 0.0, 0.0, self.std_threshold)
         
-        # Method 2: Rolling mean ± 3 standard deviations
-        historical_values = np.array(list(self.history[tag]))
-        mean = np.mean(historical_values)
-        std = np.std(historical_values)
+        # Method 1: Threshold rules
+        tmin = float(self.thr_min[i])
+        tmax = float(self.thr_max[i])
         
-        # Avoid division by zero
-        if std < 1e-6:
-            return False
+        # Method 2: Rolling mean ± 3 standard deviations, once there is
+        # enough history for statistical analysis (std=0 disables it)
+        n = self.n[i]
+        if n < 10:
+            mean, std = 0.0, 0.0
+        else:
+            mean = float(self.mean[i])
+            std = math.sqrt(self.M2[i] / n)
         
-        # Check if value is outside mean ± (std_threshold * std)
-        lower_bound = mean - (self.std_threshold * std)
-        upper_bound = mean + (self.std_threshold * std)
-        
-        if value < lower_bound or value > upper_bound:
-            return True
-        
-        return False
+        return check(value, tmin, tmax, mean, std, self.std_threshold)
     
     def analyze_reading(self, tag: str, value: float) -> bool:
         """
@@ -96,6 +173,77 @@ class AnomalyDetector:
         self.add_reading(tag, value)
         
         return is_anomaly
+    
+    def analyze_batch(self, tag: str, values: np.ndarray) -> np.ndarray:
+        """
+        Analyze a batch of readings for one tag in a single vectorized pass.
+        
+        Equivalent to calling analyze_reading for each value in order: every
+        value is checked against the rolling statistics of the readings that
+        precede it, including earlier values in the same batch.
+        
+        Args:
+            tag: Tag name
+            values: Reading values in arrival order
+        
+        Returns:
+            Boolean array, True where an anomaly was detected
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if values.size == 0:
+            return np.zeros(0, dtype=bool)
+        
+        i = self._index(tag)
+        
+        # Method 1: Threshold rules
+        thr_mask = (values < self.thr_min[i]) | (values > self.thr_max[i])
+        
+        # Method 2: Rolling mean ± 3 standard deviations over the window
+        # preceding each value, using prefix sums over history + batch
+        history = self._window(i)
+        series = np.concatenate((history, values))
+        
+        # Center on a reference value to keep the prefix sums well conditioned
+        ref = series[0]
+        centered = series - ref
+        csum = np.concatenate(([0.0], np.cumsum(centered)))
+        csum_sq = np.concatenate(([0.0], np.cumsum(centered * centered)))
+        
+        end = np.arange(history.size, series.size)
+        start = np.maximum(end - self.window_size, 0)
+        count = end - start
+        safe_count = np.maximum(count, 1)
+        
+        mean_c = (csum[end] - csum[start]) / safe_count
+        var = (csum_sq[end] - csum_sq[start]) / safe_count - mean_c * mean_c
+        std = np.sqrt(np.maximum(var, 0.0))
+        
+        stat_mask = (
+            (count >= 10)
+            & (std >= 1e-6)
+            & (np.abs(values - ref - mean_c) > self.std_threshold * std)
+        )
+        
+        # Add to history regardless of anomaly status
+        self._load_window(i, series[-self.window_size:])
+        
+        return thr_mask | stat_mask
+    
+    def _window(self, i: int) -> np.ndarray:
+        """Return the values currently in a tag's window, oldest first."""
+        n = self.n[i]
+        if n < self.window_size:
+            return self.buf[i, :n].copy()
+        idx = self.widx[i]
+        return np.concatenate((self.buf[i, idx:], self.buf[i, :idx]))
+    
+    def _load_window(self, i: int, window: np.ndarray):
+        """Replace a tag's window with the given values (oldest first)."""
+        n = window.size
+        self.buf[i, :n] = window
+        self.widx[i] = n % self.window_size
+        self.n[i] = n
+        self._resync(i)
 
 if __name__ == '__main__':
     # Test the anomaly detector
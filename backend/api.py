@@ -2,26 +2,38 @@
 FastAPI application for fermenter monitoring system.
 Provides REST API endpoints for data ingestion and querying.
 """
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Depends, Request, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field
-from typing import List, Optional
-from datetime import datetime
+from typing import Dict, List, Literal, Optional, Set
+from datetime import datetime, timezone
+from functools import lru_cache
 from sqlalchemy.orm import Session
-from sqlalchemy import desc, and_, text
+from sqlalchemy import desc, and_, text, insert
 import os
+import sys
+import time
+import queue
+import asyncio
+import logging
+import logging.handlers
+import hashlib
+import ciso8601
+import numpy as np
 
 from models import init_database, get_session, Measurement
 from anomaly_detector import AnomalyDetector
 from retry_handler import FailedOperationHandler, set_handler, get_handler
+from readings import ReadingBatch, TAG_NAMES, to_us
 
 # Initialize FastAPI app
 app = FastAPI(
     title="Fermenter Monitoring API",
     description="API for ingesting and querying fermenter sensor data with anomaly detection",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware for frontend access
@@ -41,40 +53,180 @@ anomaly_detector = AnomalyDetector(window_size=50, std_threshold=3.0)
 retry_handler = FailedOperationHandler(
     db_session_factory=lambda: get_session(engine),
     max_retries=3,
-    dead_letter_path='backend/failed_measurements.jsonl'
+    dead_letter_path='backend/failed_measurements.dlq'
 )
 set_handler(retry_handler)
 
+# In-memory counters for /stats, resynced from the database periodically
+STATS_REFRESH_SECONDS = 10.0
+_stats_cache = {
+    'total_measurements': 0,
+    'total_anomalies': 0,
+    'total_tags': 0,
+    'synced_at': None
+}
+
+
+# Last database health check result, reused by /health while fresh
+HEALTH_CACHE_SECONDS = 5.0
+_health_cache = {'status': 'healthy', 'ts': 0.0}
+
+
+def _record_ingested(count, anomalies):
+    """Update the /stats counters after measurements are committed."""
+    _stats_cache['total_measurements'] += count
+    _stats_cache['total_anomalies'] += anomalies
+
+
+# Tags served by /tags without querying the database
+_known_tags: Set[str] = set(AnomalyDetector.TAG_ID)
+
+# WebSocket clients subscribed to live measurements (/ws/live), each with
+# a bounded queue of pending updates drained by its own sender task
+WS_QUEUE_SIZE = 64
+WS_SEND_TIMEOUT = 5.0
+active_ws: Dict[WebSocket, asyncio.Queue] = {}
+
+
+async def _send_live(websocket: WebSocket, send_queue: asyncio.Queue):
+    """Send queued live updates to one client in order, dropping the client if a send fails or stalls."""
+    try:
+        while True:
+            payload = await send_queue.get()
+            if payload is None:
+                # Dropped by _broadcast for falling behind
+                await websocket.close(code=1013)
+                return
+            await asyncio.wait_for(websocket.send_json(payload), WS_SEND_TIMEOUT)
+    except Exception:
+        active_ws.pop(websocket, None)
+
+
+def _broadcast(payload: List[dict]):
+    """Queue newly stored measurements for all live clients without waiting on them."""
+    for websocket, send_queue in list(active_ws.items()):
+        try:
+            send_queue.put_nowait(payload)
+        except asyncio.QueueFull:
+            # Client can't keep up: drop it rather than buffer updates without bound
+            del active_ws[websocket]
+            while not send_queue.empty():
+                send_queue.get_nowait()
+            send_queue.put_nowait(None)
+
+
+def _parse_iso(value: str) -> datetime:
+    """
+    Parse an ISO 8601 timestamp and normalise it to naive UTC.
+    
+    Every path (direct insert, retry, dead letter queue) then stores the
+    same value, whatever offset the client sent.
+    """
+    dt = ciso8601.parse_datetime(value)
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+@lru_cache(maxsize=512)
+def _parse_ts(value: str) -> datetime:
+    """Cached ISO 8601 parse for query ranges, which polling clients repeat."""
+    return _parse_iso(value)
+
+
+def parse_ts(value: str, error_detail: str, cached: bool = False) -> datetime:
+    """Parse an ISO 8601 timestamp, raising a 400 error if it is invalid."""
+    try:
+        if cached:
+            return _parse_ts(value)
+        return _parse_iso(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=error_detail)
+
+
+def _save_measurement(session: Session, measurement: Measurement) -> int:
+    """Insert one measurement and commit, returning its id."""
+    session.add(measurement)
+    session.flush()
+    measurement_id = measurement.id
+    session.commit()
+    return measurement_id
+
+
+def _save_rows(session: Session, rows: List[dict]) -> List[int]:
+    """Insert measurement rows with one executemany and commit, returning their ids."""
+    stmt = insert(Measurement).returning(Measurement.id, sort_by_parameter_order=True)
+    ids = session.scalars(stmt, rows).all()
+    session.commit()
+    return ids
+
+
+def get_db():
+    """Provide a database session for a single request."""
+    session = get_session(engine)
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+# Retry handler logs go through a queue so the event loop never blocks on
+# stdout; the listener thread does the actual writes
+_retry_log = logging.getLogger('retry_handler')
+_log_queue = queue.SimpleQueue()
+_log_handler = logging.handlers.QueueHandler(_log_queue)
+_log_listener = logging.handlers.QueueListener(_log_queue, logging.StreamHandler(sys.stdout))
+
+
 # Startup event to recover failed measurements and start retry worker
 @app.on_event("startup")
 async def startup_event():
-    """Recover failed measurements on startup and start retry worker."""
+    """Start retry handler logging, recover failed measurements and start retry worker."""
+    _retry_log.setLevel(logging.INFO)
+    _retry_log.propagate = False
+    _retry_log.addHandler(_log_handler)
+    _log_listener.start()
     retry_handler.recover_from_dead_letter_queue()
     retry_handler.start_retry_worker()
 
 # Shutdown event to stop retry worker gracefully
 @app.on_event("shutdown")
 async def shutdown_event():
-    """Stop retry worker on shutdown."""
+    """Stop retry worker on shutdown, then flush and stop the log listener."""
     retry_handler.stop_retry_worker()
+    _log_listener.stop()
+    _retry_log.removeHandler(_log_handler)
 
 
 # Pydantic models for request/response validation
 class MeasurementInput(BaseModel):
     timestamp: str = Field(..., description="ISO format timestamp")
-    tag: str = Field(..., description="Tag name (fermenter_temp, fermenter_ph, agitator_rpm)")
+    tag: Literal[TAG_NAMES] = Field(..., description=f"Tag name ({', '.join(TAG_NAMES)})")
     value: float = Field(..., description="Measurement value")
 
 
-class MeasurementResponse(BaseModel):
-    id: int
-    timestamp: datetime
-    tag: str
-    value: float
-    is_anomaly: bool
-    
-    class Config:
-        from_attributes = True
+# Columns returned by /data and /anomalies, fetched as plain rows
+MEASUREMENT_COLUMNS = (
+    Measurement.id,
+    Measurement.timestamp,
+    Measurement.tag,
+    Measurement.value,
+    Measurement.is_anomaly
+)
+
+
+def _rows_to_dicts(rows):
+    """Convert measurement rows to JSON-ready dicts."""
+    return [
+        {
+            'id': row.id,
+            'timestamp': row.timestamp.isoformat(),
+            'tag': row.tag,
+            'value': row.value,
+            'is_anomaly': row.is_anomaly
+        }
+        for row in rows
+    ]
 
 
 # API Endpoints
@@ -88,6 +240,7 @@ async def root():
             "tags": "/tags",
             "data": "/data",
             "anomalies": "/anomalies",
+            "live": "/ws/live",
             "dashboard": "/dashboard"
         }
     }
@@ -99,35 +252,49 @@ async def get_tags():
     GET /tags
     Returns a list of available tags.
     """
-    session = get_session(engine)
+    return {"tags": sorted(_known_tags)}
+
+
+@app.post("/tags/refresh")
+async def refresh_tags(session: Session = Depends(get_db)):
+    """
+    POST /tags/refresh
+    Re-reads the distinct tags from the measurements table into the /tags cache.
+    """
+    distinct_tags = session.query(Measurement.tag).distinct().all()
+    _known_tags.update(tag[0] for tag in distinct_tags)
+    return {"tags": sorted(_known_tags)}
+
+
+@app.websocket("/ws/live")
+async def live_measurements(websocket: WebSocket):
+    """
+    WS /ws/live
+    Pushes every stored measurement as a JSON list as soon as it is ingested.
+    """
+    await websocket.accept()
+    send_queue = asyncio.Queue(maxsize=WS_QUEUE_SIZE)
+    active_ws[websocket] = send_queue
+    sender = asyncio.create_task(_send_live(websocket, send_queue))
     try:
-        # Get distinct tags from measurements table
-        distinct_tags = session.query(Measurement.tag).distinct().all()
-        tags = [tag[0] for tag in distinct_tags]
-        
-        # If no measurements yet, return the expected tags
-        if not tags:
-            tags = ['fermenter_temp', 'fermenter_ph', 'agitator_rpm']
-        
-        return {"tags": tags}
+        while True:
+            # Clients don't send anything; this just waits for the disconnect
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
     finally:
-        session.close()
+        active_ws.pop(websocket, None)
+        sender.cancel()
 
 
 @app.post("/ingest", status_code=201)
-async def ingest_measurement(measurement: MeasurementInput):
+async def ingest_measurement(measurement: MeasurementInput, session: Session = Depends(get_db)):
     """
     Accept incoming readings from the simulator.
     Validates constraints and stores in database.
     """
-    session = get_session(engine)
     try:
-        # Validate tag name
-        valid_tags = ['fermenter_temp', 'fermenter_ph', 'agitator_rpm']
-        if measurement.tag not in valid_tags:
-            raise HTTPException(status_code=400, detail=f"Invalid tag. Must be one of: {valid_tags}")
-        
-        # Validate value constraints
+        # Validate value constraints (tag names are validated by MeasurementInput)
         if measurement.tag == 'fermenter_temp' and not (30.0 <= measurement.value <= 50.0):
             raise HTTPException(status_code=400, detail="fermenter_temp must be between 30.0 and 50.0°C")
         elif measurement.tag == 'fermenter_ph' and not (5.0 <= measurement.value <= 9.0):
@@ -136,18 +303,15 @@ async def ingest_measurement(measurement: MeasurementInput):
             raise HTTPException(status_code=400, detail="agitator_rpm must be between 200.0 and 700.0 RPM")
         
         # Parse timestamp
-        try:
-            timestamp = datetime.fromisoformat(measurement.timestamp.replace('Z', '+00:00'))
-        except ValueError:
-            raise HTTPException(status_code=400, detail="Invalid timestamp format. Use ISO format.")
+        timestamp = parse_ts(measurement.timestamp, "Invalid timestamp format. Use ISO format.")
         
         # Detect anomaly
         is_anomaly = anomaly_detector.analyze_reading(measurement.tag, measurement.value)
         
         # Prepare measurement data
         measurement_data = {
-            'timestamp': timestamp.isoformat(),
-            'tag': measurement.tag,
+            'ts_us': to_us(timestamp),
+            'tag_id': ReadingBatch.TAG_ID[measurement.tag],
             'value': measurement.value,
             'is_anomaly': is_anomaly
         }
@@ -160,17 +324,25 @@ async def ingest_measurement(measurement: MeasurementInput):
                 value=measurement.value,
                 is_anomaly=is_anomaly
             )
-            session.add(db_measurement)
-            session.commit()
-            session.refresh(db_measurement)
+            # Run the blocking write in a worker thread to keep the event loop free
+            measurement_id = await asyncio.to_thread(_save_measurement, session, db_measurement)
+            _record_ingested(1, int(is_anomaly))
+            _known_tags.add(measurement.tag)
+            _broadcast([{
+                'id': measurement_id,
+                'timestamp': timestamp.replace(tzinfo=None).isoformat(),
+                'tag': measurement.tag,
+                'value': measurement.value,
+                'is_anomaly': is_anomaly
+            }])
             
             return {
                 "status": "success",
-                "id": db_measurement.id,
+                "id": measurement_id,
                 "is_anomaly": is_anomaly
             }
         except Exception as db_error:
-            session.rollback()
+            await asyncio.to_thread(session.rollback)
             # Add to retry queue instead of losing the data
             retry_handler.add_failed_measurement(measurement_data)
             
@@ -185,83 +357,87 @@ async def ingest_measurement(measurement: MeasurementInput):
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        session.close()
 
 
 @app.post("/ingest/batch", status_code=201)
-async def ingest_batch(measurements: List[MeasurementInput]):
+async def ingest_batch(measurements: List[MeasurementInput], session: Session = Depends(get_db)):
     """Ingest multiple measurements at once."""
-    session = get_session(engine)
-    results = []
+    results = [None] * len(measurements)
     
     try:
-        for measurement in measurements:
-            # Validate tag name
-            valid_tags = ['fermenter_temp', 'fermenter_ph', 'agitator_rpm']
-            if measurement.tag not in valid_tags:
-                results.append({
-                    "tag": measurement.tag,
-                    "status": "error",
-                    "error": f"Invalid tag. Must be one of: {valid_tags}"
-                })
-                continue
-            
+        # Parse timestamps and group the valid measurements by tag
+        # (tag names are validated by MeasurementInput)
+        timestamps = {}
+        by_tag = {}
+        for i, measurement in enumerate(measurements):
             # Parse timestamp
             try:
-                timestamp = datetime.fromisoformat(measurement.timestamp.replace('Z', '+00:00'))
+                timestamps[i] = _parse_iso(measurement.timestamp)
             except ValueError:
-                results.append({
+                results[i] = {
                     "tag": measurement.tag,
                     "status": "error",
                     "error": "Invalid timestamp format"
-                })
+                }
                 continue
             
-            # Detect anomaly
-            is_anomaly = anomaly_detector.analyze_reading(measurement.tag, measurement.value)
-            
-            # Prepare measurement data
-            measurement_data = {
-                'timestamp': timestamp.isoformat(),
-                'tag': measurement.tag,
-                'value': measurement.value,
-                'is_anomaly': is_anomaly
+            by_tag.setdefault(measurement.tag, []).append(i)
+        
+        # Detect anomalies with one vectorized pass per tag
+        anomaly_flags = {}
+        for tag, indices in by_tag.items():
+            values = np.fromiter((measurements[i].value for i in indices), dtype=np.float64, count=len(indices))
+            flags = anomaly_detector.analyze_batch(tag, values)
+            anomaly_flags.update(zip(indices, flags.tolist()))
+        
+        # Build one row per valid measurement, in request order
+        indices = [i for i in range(len(measurements)) if i in timestamps]
+        rows = [
+            {
+                'timestamp': timestamps[i],
+                'tag': measurements[i].tag,
+                'value': measurements[i].value,
+                'is_anomaly': anomaly_flags[i]
             }
-            
-            # Try to create measurement
+            for i in indices
+        ]
+        
+        # Insert all rows with a single executemany statement
+        if rows:
             try:
-                db_measurement = Measurement(
-                    timestamp=timestamp,
-                    tag=measurement.tag,
-                    value=measurement.value,
-                    is_anomaly=is_anomaly
-                )
-                session.add(db_measurement)
-                session.flush()
+                # Run the blocking write in a worker thread to keep the event loop free
+                ids = await asyncio.to_thread(_save_rows, session, rows)
+                _record_ingested(len(rows), sum(row['is_anomaly'] for row in rows))
+                _known_tags.update(by_tag)
+                _broadcast([
+                    {
+                        'id': measurement_id,
+                        'timestamp': row['timestamp'].replace(tzinfo=None).isoformat(),
+                        'tag': row['tag'],
+                        'value': row['value'],
+                        'is_anomaly': row['is_anomaly']
+                    }
+                    for row, measurement_id in zip(rows, ids)
+                ])
                 
-                results.append({
-                    "tag": measurement.tag,
-                    "status": "success",
-                    "id": db_measurement.id,
-                    "is_anomaly": is_anomaly
-                })
+                for i, row, measurement_id in zip(indices, rows, ids):
+                    results[i] = {
+                        "tag": row['tag'],
+                        "status": "success",
+                        "id": measurement_id,
+                        "is_anomaly": row['is_anomaly']
+                    }
             except Exception as db_error:
-                # Add to retry queue if database save fails
-                retry_handler.add_failed_measurement(measurement_data)
-                results.append({
-                    "tag": measurement.tag,
-                    "status": "queued_for_retry",
-                    "is_anomaly": is_anomaly,
-                    "error": str(db_error)
-                })
-        
-        try:
-            session.commit()
-        except Exception as commit_error:
-            session.rollback()
-            # If commit fails, queue all measurements that were added in this batch
-            print(f"⚠ Batch commit failed: {commit_error}")
+                await asyncio.to_thread(session.rollback)
+                # Queue the whole batch for retry as a single item
+                retry_handler.add_failed_batch(ReadingBatch.from_rows(rows))
+                for i, row in zip(indices, rows):
+                    results[i] = {
+                        "tag": row['tag'],
+                        "status": "queued_for_retry",
+                        "is_anomaly": row['is_anomaly'],
+                        "error": str(db_error)
+                    }
         
         return {
             "status": "success",
@@ -271,130 +447,121 @@ async def ingest_batch(measurements: List[MeasurementInput]):
     except Exception as e:
         session.rollback()
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        session.close()
 
 
-@app.get("/data", response_model=List[MeasurementResponse])
+@app.get("/data")
 async def get_data(
     tag: str = Query(..., description="Tag name to query"),
     from_time: Optional[str] = Query(None, alias="from", description="Start timestamp (ISO format)"),
-    to_time: Optional[str] = Query(None, alias="to", description="End timestamp (ISO format)")
+    to_time: Optional[str] = Query(None, alias="to", description="End timestamp (ISO format)"),
+    session: Session = Depends(get_db)
 ):
     """
     GET /data
     Query time-series data points for a given tag and optional time range.
     """
-    session = get_session(engine)
-    try:
-        # Build query
-        query = session.query(Measurement).filter(Measurement.tag == tag)
-        
-        # Apply time filters if provided
-        if from_time:
-            try:
-                from_dt = datetime.fromisoformat(from_time.replace('Z', '+00:00'))
-                query = query.filter(Measurement.timestamp >= from_dt)
-            except ValueError:
-                raise HTTPException(status_code=400, detail="Invalid 'from' timestamp format")
-        
-        if to_time:
-            try:
-                to_dt = datetime.fromisoformat(to_time.replace('Z', '+00:00'))
-                query = query.filter(Measurement.timestamp <= to_dt)
-            except ValueError:
-                raise HTTPException(status_code=400, detail="Invalid 'to' timestamp format")
-        
-        # Order by timestamp
-        measurements = query.order_by(Measurement.timestamp.desc()).limit(1000).all()
-        
-        return measurements
-    finally:
-        session.close()
+    # Build query
+    query = session.query(*MEASUREMENT_COLUMNS).filter(Measurement.tag == tag)
+    
+    # Apply time filters if provided
+    if from_time:
+        from_dt = parse_ts(from_time, "Invalid 'from' timestamp format", cached=True)
+        query = query.filter(Measurement.timestamp >= from_dt)
+    
+    if to_time:
+        to_dt = parse_ts(to_time, "Invalid 'to' timestamp format", cached=True)
+        query = query.filter(Measurement.timestamp <= to_dt)
+    
+    # Order by timestamp
+    measurements = query.order_by(Measurement.timestamp.desc()).limit(1000).all()
+    
+    return _rows_to_dicts(measurements)
 
 
-@app.get("/anomalies", response_model=List[MeasurementResponse])
+@app.get("/anomalies")
 async def get_anomalies(
     tag: str = Query(..., description="Tag name to query"),
     from_time: Optional[str] = Query(None, alias="from", description="Start timestamp (ISO format)"),
-    to_time: Optional[str] = Query(None, alias="to", description="End timestamp (ISO format)")
+    to_time: Optional[str] = Query(None, alias="to", description="End timestamp (ISO format)"),
+    session: Session = Depends(get_db)
 ):
     """
     GET /anomalies
     Returns only the records flagged as anomalies for the given tag and time range.
     """
-    session = get_session(engine)
-    try:
-        # Build query - only anomalies
-        query = session.query(Measurement).filter(
-            and_(Measurement.tag == tag, Measurement.is_anomaly == True)
-        )
-        
-        # Apply time filters if provided
-        if from_time:
-            try:
-                from_dt = datetime.fromisoformat(from_time.replace('Z', '+00:00'))
-                query = query.filter(Measurement.timestamp >= from_dt)
-            except ValueError:
-                raise HTTPException(status_code=400, detail="Invalid 'from' timestamp format")
-        
-        if to_time:
-            try:
-                to_dt = datetime.fromisoformat(to_time.replace('Z', '+00:00'))
-                query = query.filter(Measurement.timestamp <= to_dt)
-            except ValueError:
-                raise HTTPException(status_code=400, detail="Invalid 'to' timestamp format")
-        
-        # Order by timestamp
-        anomalies = query.order_by(Measurement.timestamp.desc()).limit(1000).all()
-        
-        return anomalies
-    finally:
-        session.close()
+    # Build query - only anomalies
+    query = session.query(*MEASUREMENT_COLUMNS).filter(
+        and_(Measurement.tag == tag, Measurement.is_anomaly == True)
+    )
+    
+    # Apply time filters if provided
+    if from_time:
+        from_dt = parse_ts(from_time, "Invalid 'from' timestamp format", cached=True)
+        query = query.filter(Measurement.timestamp >= from_dt)
+    
+    if to_time:
+        to_dt = parse_ts(to_time, "Invalid 'to' timestamp format", cached=True)
+        query = query.filter(Measurement.timestamp <= to_dt)
+    
+    # Order by timestamp
+    anomalies = query.order_by(Measurement.timestamp.desc()).limit(1000).all()
+    
+    return _rows_to_dicts(anomalies)
 
 
 @app.get("/stats")
-async def get_statistics():
+async def get_statistics(session: Session = Depends(get_db)):
     """Get overall system statistics."""
-    session = get_session(engine)
-    try:
-        total_measurements = session.query(Measurement).count()
-        total_anomalies = session.query(Measurement).filter(Measurement.is_anomaly == True).count()
-        
-        # Get distinct tags
-        distinct_tags = session.query(Measurement.tag).distinct().count()
-        
-        # Get retry queue status
-        retry_queue_size = retry_handler.retry_queue.qsize()
-        
-        return {
-            "total_tags": distinct_tags,
-            "total_measurements": total_measurements,
-            "total_anomalies": total_anomalies,
-            "anomaly_rate": round(total_anomalies / total_measurements * 100, 2) if total_measurements > 0 else 0,
-            "retry_queue_size": retry_queue_size,
-            "retry_queue_status": "pending" if retry_queue_size > 0 else "clear"
-        }
-    finally:
-        session.close()
+    # Resync the in-memory counters with one aggregate query when stale
+    now = time.monotonic()
+    if _stats_cache['synced_at'] is None or now - _stats_cache['synced_at'] >= STATS_REFRESH_SECONDS:
+        row = session.execute(text(
+            "SELECT COUNT(*), "
+            "COALESCE(SUM(CASE WHEN is_anomaly THEN 1 ELSE 0 END), 0), "
+            "COUNT(DISTINCT tag) "
+            "FROM measurements"
+        )).one()
+        _stats_cache['total_measurements'], _stats_cache['total_anomalies'], _stats_cache['total_tags'] = row
+        _stats_cache['synced_at'] = now
+    
+    total_measurements = _stats_cache['total_measurements']
+    total_anomalies = _stats_cache['total_anomalies']
+    distinct_tags = _stats_cache['total_tags']
+    
+    # Measurements awaiting retry, including those waiting out their backoff
+    retry_queue_size = retry_handler.pending_count
+    
+    return {
+        "total_tags": distinct_tags,
+        "total_measurements": total_measurements,
+        "total_anomalies": total_anomalies,
+        "anomaly_rate": round(total_anomalies / total_measurements * 100, 2) if total_measurements > 0 else 0,
+        "retry_queue_size": retry_queue_size,
+        "retry_queue_status": "pending" if retry_queue_size > 0 else "clear",
+        "retry_overflow_count": retry_handler.overflow_count
+    }
 
 
 @app.get("/health")
-async def health_check():
+async def health_check(session: Session = Depends(get_db)):
     """
     Health check endpoint.
     Returns system health including retry queue status.
     """
-    try:
-        # Check database connectivity
-        session = get_session(engine)
-        session.execute(text("SELECT 1"))
-        session.close()
-        db_status = "healthy"
-    except Exception as e:
-        db_status = f"unhealthy: {str(e)}"
+    # Check database connectivity, reusing a recent healthy result
+    now = time.monotonic()
+    if _health_cache['status'] == "healthy" and now - _health_cache['ts'] < HEALTH_CACHE_SECONDS:
+        db_status = _health_cache['status']
+    else:
+        try:
+            session.execute(text("SELECT 1"))
+            db_status = "healthy"
+        except Exception as e:
+            db_status = f"unhealthy: {str(e)}"
+        _health_cache['status'] = db_status
+        _health_cache['ts'] = now
     
-    retry_queue_size = retry_handler.retry_queue.qsize()
+    retry_queue_size = retry_handler.pending_count
     
     return {
         "status": "healthy" if db_status == "healthy" else "degraded",
@@ -409,13 +576,24 @@ frontend_path = os.path.join(os.path.dirname(__file__), "..", "frontend")
 if os.path.exists(frontend_path):
     app.mount("/static", StaticFiles(directory=frontend_path), name="static")
     
+    # Read the dashboard once at startup so requests don't touch the filesystem
+    dashboard_file = os.path.join(frontend_path, "dashboard.html")
+    DASHBOARD_BYTES = None
+    DASHBOARD_ETAG = None
+    if os.path.exists(dashboard_file):
+        with open(dashboard_file, 'rb') as f:
+            DASHBOARD_BYTES = f.read()
+        DASHBOARD_ETAG = f'"{hashlib.md5(DASHBOARD_BYTES).hexdigest()}"'
+    
     @app.get("/dashboard")
-    async def serve_dashboard():
+    def serve_dashboard(request: Request):
         """Serve the dashboard HTML page."""
-        dashboard_file = os.path.join(frontend_path, "dashboard.html")
-        if os.path.exists(dashboard_file):
-            return FileResponse(dashboard_file)
-        raise HTTPException(status_code=404, detail="Dashboard not found")
+        if DASHBOARD_BYTES is None:
+            raise HTTPException(status_code=404, detail="Dashboard not found")
+        headers = {'ETag': DASHBOARD_ETAG, 'Cache-Control': 'public, max-age=60'}
+        if request.headers.get('if-none-match') == DASHBOARD_ETAG:
+            return Response(status_code=304, headers=headers)
+        return Response(content=DASHBOARD_BYTES, media_type='text/html', headers=headers)
 
 
 if __name__ == "__main__":
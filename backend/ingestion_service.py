@@ -2,6 +2,7 @@
 Service to continuously run the simulator and ingest data into the API.
 """
 import requests
+from requests.adapters import HTTPAdapter
 import time
 from simulator import SensorSimulator
 
@@ -9,14 +10,49 @@ from simulator import SensorSimulator
 class IngestionService:
     """Service that runs the simulator and ingests data to the backend API."""
     
-    def __init__(self, api_base_url='http://localhost:8000'):
+    def __init__(self, api_base_url='http://localhost:8000', ticks_per_request=1):
+        """
+        Initialize the ingestion service.
+        
+        Args:
+            api_base_url: Base URL of the ingestion API
+            ticks_per_request: Number of simulator batches to combine into one POST
+        """
         self.api_base_url = api_base_url
         self.simulator = SensorSimulator()
+        self.ticks_per_request = ticks_per_request
+        self._pending_ticks = 0
+        
+        # Readings are read back from the simulator's ring at send time
+        # instead of being buffered per tick
+        self._reader = self.simulator.ring.reader()
+        
+        # Keep-alive session so each POST reuses the same connection
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+    
+    def on_tick(self):
+        """Count a simulator tick and send once enough ticks have accumulated; the readings are read from the ring."""
+        self._pending_ticks += 1
+        if self._pending_ticks >= self.ticks_per_request:
+            self.flush()
     
-    def ingest_readings(self, readings):
-        """Send a batch of readings to the API."""
+    def flush(self):
+        """Send all readings generated since the last flush to the API."""
+        self._pending_ticks = 0
+        lost = self._reader.overflow_count
+        batch = self._reader.read()
+        if self._reader.overflow_count > lost:
+            print(f"⚠ Ingestion fell behind; dropped {self._reader.overflow_count - lost} readings")
+        if not len(batch):
+            return
+        # The API takes JSON objects, so dicts are only built here at the HTTP boundary
+        readings = batch.to_dicts()
+        
         try:
-            response = requests.post(
+            response = self.session.post(
                 f'{self.api_base_url}/ingest/batch',
                 json=readings,
                 timeout=5
@@ -40,7 +76,7 @@ class IngestionService:
         max_retries = 30
         for i in range(max_retries):
             try:
-                response = requests.get(f'{self.api_base_url}/')
+                response = self.session.get(f'{self.api_base_url}/')
                 if response.status_code == 200:
                     print("✓ API is ready")
                     break
@@ -58,11 +94,15 @@ class IngestionService:
         print("  - agitator_rpm (300-600 RPM)")
         print("-" * 60)
         
-        # Run simulator with ingestion callback
-        self.simulator.simulate_continuous(
-            callback=self.ingest_readings,
-            interval_seconds=interval_seconds
-        )
+        # Run simulator with ingestion callback; each batch is already in the ring
+        try:
+            self.simulator.simulate_continuous(
+                callback=lambda batch: self.on_tick(),
+                interval_seconds=interval_seconds
+            )
+        finally:
+            self.flush()
+            self.session.close()
 
 
 if __name__ == '__main__':
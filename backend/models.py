@@ -2,7 +2,7 @@
 Database models for fermenter monitoring system.
 """
 from datetime import datetime
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Boolean
+from sqlalchemy import create_engine, event, inspect, text, Column, Integer, String, Float, DateTime, Boolean, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
@@ -15,23 +15,53 @@ class Measurement(Base):
     
     id = Column(Integer, primary_key=True)
     timestamp = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
-    tag = Column(String(100), nullable=False, index=True)
-    value = Column(Float, nullable=False)
-    is_anomaly = Column(Boolean, default=False, nullable=False)
+    tag = Column(String(100), nullable=False)  # indexed as the leading column of ix_tag_ts
+    value = Column(Float(precision=24), nullable=False)  # single precision is ample for sensor readings
+    is_anomaly = Column(Boolean, default=False, server_default=text('0'), nullable=False)
+    
+    __table_args__ = (
+        # Serves tag filters ordered by timestamp (/data)
+        Index('ix_tag_ts', 'tag', 'timestamp'),
+        # Partial index covering only anomalies (/anomalies)
+        Index('ix_anom_tag_ts', 'tag', 'timestamp', sqlite_where=text('is_anomaly = 1')),
+    )
     
     def __repr__(self):
         return f"<Measurement(tag='{self.tag}', value={self.value}, timestamp={self.timestamp}, is_anomaly={self.is_anomaly})>"
 
 
 # Database setup utilities
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Use WAL journaling so readers don't block the ingest writer."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.execute('PRAGMA synchronous=NORMAL')
+    cursor.close()
+
+
 def init_database(db_url='sqlite:///sensor_data.db'):
     """Initialize the database and create all tables."""
-    engine = create_engine(db_url, echo=False)
+    if db_url.startswith('sqlite'):
+        engine = create_engine(db_url, echo=False, connect_args={'check_same_thread': False})
+        event.listen(engine, 'connect', _set_sqlite_pragmas)
+    else:
+        engine = create_engine(db_url, echo=False)
     Base.metadata.create_all(engine)
+    # create_all skips existing tables, so add any indexes missing from older databases
+    for index in Measurement.__table__.indexes:
+        index.create(engine, checkfirst=True)
+    # and drop the single-column tag index they had, a redundant prefix of ix_tag_ts
+    if any(ix['name'] == 'ix_measurements_tag' for ix in inspect(engine).get_indexes('measurements')):
+        with engine.begin() as conn:
+            conn.execute(text('DROP INDEX ix_measurements_tag'))
+    # Build the session factory once and reuse it for every request
+    engine._SessionLocal = sessionmaker(bind=engine, expire_on_commit=False)
     return engine
 
 
 def get_session(engine):
     """Create and return a database session."""
-    Session = sessionmaker(bind=engine)
-    return Session()
+    session_factory = getattr(engine, '_SessionLocal', None)
+    if session_factory is None:
+        session_factory = engine._SessionLocal = sessionmaker(bind=engine, expire_on_commit=False)
+    return session_factory()
@@ -0,0 +1,164 @@
+"""
+Struct-of-arrays containers for sensor readings.
+Readings travel as parallel NumPy arrays and are only turned into
+dicts or ORM objects at the HTTP / database boundary.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+
+import numpy as np
+
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# The known sensor tags; a tag's position is its integer id everywhere
+# (ReadingBatch.tag_ids, AnomalyDetector rows, dead letter records)
+TAG_NAMES = ('fermenter_temp', 'fermenter_ph', 'agitator_rpm')
+TAG_ID = {tag: i for i, tag in enumerate(TAG_NAMES)}
+
+
+def to_us(dt: datetime) -> int:
+    """Convert a datetime to integer microseconds since the Unix epoch (naive = UTC)."""
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return (dt - EPOCH) // timedelta(microseconds=1)
+
+
+def from_us(ts_us: int) -> datetime:
+    """Convert integer microseconds since the Unix epoch to a UTC datetime (exact, no float rounding)."""
+    return EPOCH + timedelta(microseconds=ts_us)
+
+
+class ReadingBatch:
+    """
+    Parallel arrays of readings (struct of arrays).
+    
+    Attributes:
+        ts: int64 timestamps, microseconds since the Unix epoch (UTC)
+        tag_ids: uint8 indexes into TAG_NAMES
+        values: float32 reading values
+        is_anomaly: bool anomaly flags
+    """
+    
+    # Tag encoding
+    TAG_NAMES = TAG_NAMES
+    TAG_ID = TAG_ID
+    
+    def __init__(self, ts, tag_ids, values, is_anomaly=None):
+        self.ts = np.asarray(ts, dtype=np.int64)
+        self.tag_ids = np.asarray(tag_ids, dtype=np.uint8)
+        self.values = np.asarray(values, dtype=np.float32)
+        if is_anomaly is None:
+            is_anomaly = np.zeros(self.ts.size, dtype=bool)
+        self.is_anomaly = np.asarray(is_anomaly, dtype=bool)
+    
+    def __len__(self):
+        return self.ts.size
+    
+    @classmethod
+    def from_rows(cls, rows: List[Dict]) -> 'ReadingBatch':
+        """Build a batch from dicts with 'timestamp' (datetime), 'tag', 'value', 'is_anomaly'."""
+        return cls(
+            ts=[to_us(row['timestamp']) for row in rows],
+            tag_ids=[cls.TAG_ID[row['tag']] for row in rows],
+            values=[row['value'] for row in rows],
+            is_anomaly=[row['is_anomaly'] for row in rows],
+        )
+    
+    def timestamps(self) -> List[datetime]:
+        """Return the timestamps as timezone-aware UTC datetimes."""
+        return [from_us(ts_us) for ts_us in self.ts.tolist()]
+    
+    def tags(self) -> List[str]:
+        """Return the tag name of each reading."""
+        names = self.TAG_NAMES
+        return [names[i] for i in self.tag_ids.tolist()]
+    
+    def value_list(self) -> List[float]:
+        """Return the values as Python floats, trimmed to float32 precision (37.9, not 37.900001525878906)."""
+        return [float('%.7g' % value) for value in self.values.tolist()]
+    
+    def to_dicts(self) -> List[Dict]:
+        """Materialize one dict per reading with an ISO 'timestamp', 'tag', 'value', 'is_anomaly'."""
+        return [
+            {'timestamp': ts.isoformat(), 'tag': tag, 'value': value, 'is_anomaly': is_anomaly}
+            for ts, tag, value, is_anomaly in zip(
+                self.timestamps(), self.tags(), self.value_list(), self.is_anomaly.tolist()
+            )
+        ]
+    
+    def to_records(self) -> List[Dict]:
+        """Materialize one compact dict per reading: integer 'ts_us' and 'tag_id', 'value', 'is_anomaly'."""
+        return [
+            {'ts_us': ts_us, 'tag_id': tag_id, 'value': value, 'is_anomaly': is_anomaly}
+            for ts_us, tag_id, value, is_anomaly in zip(
+                self.ts.tolist(), self.tag_ids.tolist(), self.value_list(), self.is_anomaly.tolist()
+            )
+        ]
+
+
+class ReadingRing:
+    """
+    Fixed-size circular buffer of recent readings stored as packed records.
+    
+    One writer, any number of readers. The writer never blocks: once the
+    ring is full the oldest records are overwritten, and a reader that
+    falls more than a full ring behind skips ahead and counts what it lost.
+    """
+    
+    DTYPE = np.dtype([('ts', 'i8'), ('tag', 'u1'), ('val', 'f4'), ('is_anom', 'u1')])
+    
+    def __init__(self, size=1 << 14):
+        if size & (size - 1):
+            raise ValueError("size must be a power of two")
+        self.size = size
+        self._mask = size - 1
+        self._ring = np.zeros(size, dtype=self.DTYPE)
+        self.widx = 0  # total records ever written; only the writer advances it
+    
+    def write(self, batch: ReadingBatch):
+        """Append a batch of readings, overwriting the oldest records when full."""
+        n = len(batch)
+        if n > self.size:
+            # Only the newest size records would survive anyway
+            skip = n - self.size
+            self.widx += skip
+            ts, tags, vals, anom = (batch.ts[skip:], batch.tag_ids[skip:],
+                                    batch.values[skip:], batch.is_anomaly[skip:])
+            n = self.size
+        else:
+            ts, tags, vals, anom = batch.ts, batch.tag_ids, batch.values, batch.is_anomaly
+        
+        idx = (self.widx + np.arange(n)) & self._mask
+        ring = self._ring
+        ring['ts'][idx] = ts
+        ring['tag'][idx] = tags
+        ring['val'][idx] = vals
+        ring['is_anom'][idx] = anom
+        self.widx += n
+    
+    def reader(self) -> 'RingReader':
+        """Return a reader positioned at the current end of the ring."""
+        return RingReader(self)
+
+
+class RingReader:
+    """Read position into a ReadingRing, with a count of records lost to overwrites."""
+    
+    def __init__(self, ring: ReadingRing):
+        self.ring = ring
+        self.ridx = ring.widx
+        self.overflow_count = 0
+    
+    def read(self) -> ReadingBatch:
+        """Return all records written since the last read as a ReadingBatch."""
+        ring = self.ring
+        widx = ring.widx
+        if widx - self.ridx > ring.size:
+            # Lapped by the writer: skip to the oldest record still in the ring
+            self.overflow_count += widx - ring.size - self.ridx
+            self.ridx = widx - ring.size
+        
+        records = ring._ring[np.arange(self.ridx, widx) & ring._mask]
+        self.ridx = widx
+        return ReadingBatch(records['ts'], records['tag'], records['val'], records['is_anom'])
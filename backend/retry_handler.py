@@ -2,13 +2,150 @@
 Retry handler for failed database operations.
 Implements retry logic with exponential backoff and dead letter queue.
 """
+import os
 import json
 import time
+import atexit
+import struct
+import heapq
+import random
+import itertools
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List
 import threading
 import queue
+import logging
+from collections import deque
+
+import numpy as np
+from sqlalchemy import insert
+from sqlalchemy.exc import DataError, IntegrityError, StatementError
+
+from readings import ReadingBatch, from_us, to_us
+
+
+# Handlers are configured by the application (see api.py); per-item messages are at DEBUG level
+log = logging.getLogger(__name__)
+
+# Binary dead letter queue format: a magic/version header, then fixed-size
+# records of (ts_us int64, tag_id u8, value f32, is_anomaly u8, retry_count u8)
+DLQ_MAGIC = b'SDLQ'
+DLQ_VERSION = 1
+DLQ_HEADER = DLQ_MAGIC + bytes([DLQ_VERSION])
+DLQ_RECORD = struct.Struct('<qBfBB')
+DLQ_DTYPE = np.dtype([('ts', '<i8'), ('tag', 'u1'), ('val', '<f4'), ('is_anom', 'u1'), ('retry', 'u1')])
+assert DLQ_DTYPE.itemsize == DLQ_RECORD.size
+
+# Errors caused by the retried rows themselves rather than the database being
+# unavailable (constraint violations, bad values, malformed legacy records)
+_ROW_ERRORS = (IntegrityError, DataError, KeyError, TypeError, ValueError)
+
+# Max buffers per writev call (IOV_MAX); 1024 on Linux
+_IOV_MAX = os.sysconf('SC_IOV_MAX') if hasattr(os, 'sysconf') else 1024
+
+
+def _write_all(fd: int, bufs: List[bytes]):
+    """Write all buffers to fd, with os.writev where available, handling short writes."""
+    if not hasattr(os, 'writev'):
+        data = b''.join(bufs)
+        while data:
+            data = data[os.write(fd, data):]
+        return
+    
+    for start in range(0, len(bufs), _IOV_MAX):
+        chunk = bufs[start:start + _IOV_MAX]
+        written = os.writev(fd, chunk)
+        remaining = sum(map(len, chunk)) - written
+        if remaining:
+            # Short write: finish the rest of this chunk with plain writes
+            data = b''.join(chunk)[written:]
+            while data:
+                data = data[os.write(fd, data):]
+
+
+def read_dead_letter_file(path):
+    """
+    Yield the records of a dead letter file as dicts, binary or legacy JSON lines.
+    Yields None for each record that can't be read; raises ValueError if
+    the binary header itself is truncated or has an unknown version.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    
+    if not data.startswith(DLQ_MAGIC):
+        # Legacy format: one JSON object per line
+        for line in data.splitlines():
+            try:
+                yield json.loads(line)
+            except ValueError as e:
+                log.warning("✗ Error recovering measurement: %s", e)
+                yield None
+        return
+    
+    if len(data) < len(DLQ_HEADER):
+        raise ValueError(f"Truncated dead letter queue header in {path}")
+    if data[len(DLQ_MAGIC)] != DLQ_VERSION:
+        raise ValueError(f"Unsupported dead letter queue version {data[len(DLQ_MAGIC)]} in {path}")
+    
+    body = memoryview(data)[len(DLQ_HEADER):]
+    whole = len(body) - len(body) % DLQ_RECORD.size
+    for ts_us, tag_id, value, is_anomaly, retry_count in DLQ_RECORD.iter_unpack(body[:whole]):
+        yield {
+            'ts_us': ts_us,
+            'tag_id': tag_id,
+            'value': float('%.7g' % value),  # trim float32 noise, as ReadingBatch.value_list does
+            'is_anomaly': bool(is_anomaly),
+            'retry_count': retry_count,
+        }
+    if whole < len(body):
+        # Partial record at the end, e.g. from a crash mid-write
+        log.warning("✗ Error recovering measurement: truncated record at end of %s", path)
+        yield None
+
+
+class BoundedRetryRing:
+    """
+    Fixed-capacity FIFO used as the retry queue.
+    Many producers, one consumer; put never blocks and reports overflow instead.
+    """
+    
+    def __init__(self, cap=10_000):
+        self.cap = cap
+        self.overflow_count = 0  # rejected puts, counted under the lock
+        self._items = deque()
+        self._lock = threading.Lock()
+        self._not_empty = threading.Event()  # set exactly while items are queued
+    
+    def put(self, item) -> bool:
+        """Append an item. Returns False without queueing it if the ring is full."""
+        with self._lock:
+            if len(self._items) >= self.cap:
+                self.overflow_count += 1
+                return False
+            self._items.append(item)
+            self._not_empty.set()
+        return True
+    
+    def get(self, timeout=None):
+        """Remove and return the oldest item, raising queue.Empty after timeout."""
+        if not self._not_empty.wait(timeout):
+            raise queue.Empty
+        return self.get_nowait()
+    
+    def get_nowait(self):
+        """Remove and return the oldest item, raising queue.Empty if there is none."""
+        with self._lock:
+            if not self._items:
+                raise queue.Empty
+            item = self._items.popleft()
+            if not self._items:
+                self._not_empty.clear()
+        return item
+    
+    def qsize(self) -> int:
+        """Return the number of queued items."""
+        return len(self._items)
 
 
 class FailedOperationHandler:
@@ -17,14 +154,53 @@ class FailedOperationHandler:
     Stores failed operations to disk as a backup (dead letter queue).
     """
     
-    def __init__(self, db_session_factory, max_retries=3, dead_letter_path='failed_measurements.jsonl'):
+    def __init__(self, db_session_factory, max_retries=3, dead_letter_path='failed_measurements.dlq', batch_size=500,
+                 retry_queue_size=10_000):
         self.db_session_factory = db_session_factory
         self.max_retries = max_retries
+        self.batch_size = batch_size
+        self.recover_batch_size = 1000
         self.dead_letter_path = Path(dead_letter_path)
-        self.retry_queue = queue.Queue()
+        self.retry_queue = BoundedRetryRing(cap=retry_queue_size)
         self.running = False
         self.retry_thread = None
+        self._session = None  # retry thread's session, reused across retries
+        self._pending = 0  # measurements queued or waiting out their backoff
+        self._pending_lock = threading.Lock()
         
+        # Items waiting out their backoff, as (ready_at, seq, item) ordered by ready_at
+        self.max_backoff = 60.0
+        self._delay_heap: List = []
+        self._delay_seq = itertools.count()
+        self._delay_lock = threading.Lock()
+        
+        # Buffered dead letter queue writes
+        self.dlq_batch_size = 500
+        self.dlq_flush_interval = 1.0
+        self._dlq_buffer: List[bytes] = []  # packed records
+        self._dlq_lock = threading.Lock()  # guards _dlq_buffer only, never held during I/O
+        self._dlq_write_lock = threading.Lock()  # guards _dlq_fd and the writes themselves
+        self._dlq_wake = threading.Event()  # set when the buffer reaches dlq_batch_size
+        self._dlq_stop = threading.Event()
+        self._dlq_thread = None
+        self._dlq_fd = None  # append-only descriptor, opened on first write
+        atexit.register(self._flush_and_close_dlq)
+    
+    @property
+    def overflow_count(self) -> int:
+        """Number of items that found the retry queue full and went straight to the dead letter queue."""
+        return self.retry_queue.overflow_count
+    
+    @property
+    def pending_count(self) -> int:
+        """Number of measurements waiting to be retried, queued or waiting out their backoff."""
+        return self._pending
+    
+    def _add_pending(self, n: int):
+        """Adjust the pending measurement count by n."""
+        with self._pending_lock:
+            self._pending += n
+    
     def start_retry_worker(self):
         """Start background worker to retry failed operations."""
         if self.running:
@@ -33,150 +209,447 @@ class FailedOperationHandler:
         self.running = True
         self.retry_thread = threading.Thread(target=self._retry_worker, daemon=True)
         self.retry_thread.start()
-        print("✓ Retry worker started")
+        self._dlq_stop.clear()
+        self._dlq_wake.clear()
+        self._dlq_thread = threading.Thread(target=self._dlq_flush_worker, daemon=True)
+        self._dlq_thread.start()
+        log.info("✓ Retry worker started")
     
     def stop_retry_worker(self):
         """Stop the retry worker."""
         self.running = False
         if self.retry_thread:
+            # The worker closes its own session on the way out
             self.retry_thread.join(timeout=5)
+        self._dlq_stop.set()
+        self._dlq_wake.set()
+        if self._dlq_thread:
+            self._dlq_thread.join(timeout=5)
+        
+        # Persist retries still queued or waiting out their backoff so they aren't lost
+        with self._delay_lock:
+            pending = [entry[2] for entry in self._delay_heap]
+            self._delay_heap.clear()
+        while True:
+            try:
+                pending.append(self.retry_queue.get_nowait())
+            except queue.Empty:
+                break
+        self._add_pending(-sum(map(self._size, pending)))
+        for measurement_data in pending:
+            self.save_to_dead_letter_queue(measurement_data)
+        self._flush_and_close_dlq()
     
     def add_failed_measurement(self, measurement_data: Dict):
         """
         Add a failed measurement to the retry queue.
         
+        Never blocks and does no logging: the producer only enqueues, and if
+        the retry queue is full the measurement goes to the dead letter queue
+        (counted in overflow_count). Retries and their logging happen on the
+        retry worker thread.
+        
         Args:
-            measurement_data: Dict with 'timestamp', 'tag', 'value', 'is_anomaly'
+            measurement_data: Dict with 'ts_us' (int microseconds since the epoch),
+                'tag_id' (index into ReadingBatch.TAG_NAMES), 'value', 'is_anomaly'
         """
         measurement_data['retry_count'] = 0
-        measurement_data['first_failed_at'] = datetime.utcnow().isoformat()
-        self.retry_queue.put(measurement_data)
-        print(f"⚠ Measurement queued for retry: {measurement_data['tag']} = {measurement_data['value']}")
+        self._enqueue(measurement_data)
+    
+    def add_failed_batch(self, batch: ReadingBatch):
+        """
+        Add a batch of failed measurements to the retry queue as a single item.
+        
+        Args:
+            batch: ReadingBatch of measurements that could not be saved
+        """
+        batch.retry_count = 0
+        self._enqueue(batch)
+    
+    def _enqueue(self, measurement_data: Dict):
+        """Queue a measurement for retry, spilling to the dead letter queue if full."""
+        # Counted before the put so the worker can never take it out of the count first
+        size = self._size(measurement_data)
+        self._add_pending(size)
+        if not self.retry_queue.put(measurement_data):
+            self._add_pending(-size)
+            self.save_to_dead_letter_queue(measurement_data)
     
     def save_to_dead_letter_queue(self, measurement_data: Dict):
         """
         Save failed measurement to disk as a backup.
         This ensures no data is lost even if retries fail.
+        
+        Only appends to an in-memory buffer, so it is safe to call from the
+        event loop. The flush worker writes the buffer every dlq_flush_interval,
+        or as soon as it reaches dlq_batch_size.
         """
-        try:
-            with open(self.dead_letter_path, 'a') as f:
-                json.dump(measurement_data, f)
-                f.write('\n')
-            print(f"✓ Saved to dead letter queue: {self.dead_letter_path}")
-        except Exception as e:
-            print(f"✗ Failed to write to dead letter queue: {e}")
+        if isinstance(measurement_data, ReadingBatch):
+            # One record per reading, packed in a single pass
+            records = np.empty(len(measurement_data), dtype=DLQ_DTYPE)
+            records['ts'] = measurement_data.ts
+            records['tag'] = measurement_data.tag_ids
+            records['val'] = measurement_data.values
+            records['is_anom'] = measurement_data.is_anomaly
+            records['retry'] = min(measurement_data.retry_count, 255)
+            data = records.tobytes()
+        else:
+            data = DLQ_RECORD.pack(
+                measurement_data['ts_us'] if 'ts_us' in measurement_data else to_us(self._timestamp(measurement_data)),
+                ReadingBatch.TAG_ID[self._tag(measurement_data)],
+                measurement_data['value'],
+                measurement_data['is_anomaly'],
+                min(measurement_data.get('retry_count', 0), 255),
+            )
+        
+        with self._dlq_lock:
+            self._dlq_buffer.append(data)
+            full = len(self._dlq_buffer) >= self.dlq_batch_size
+        if full:
+            self._dlq_wake.set()
+    
+    def flush(self):
+        """Write any buffered dead letter queue records to disk with one vectored write."""
+        with self._dlq_write_lock:
+            # Swap the buffer out so producers can keep appending during the write
+            with self._dlq_lock:
+                buffer, self._dlq_buffer = self._dlq_buffer, []
+            if not buffer:
+                return
+            
+            start = None  # file size before this write
+            try:
+                if self._dlq_fd is None:
+                    self._dlq_fd = os.open(self.dead_letter_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+                    if os.fstat(self._dlq_fd).st_size == 0:
+                        os.write(self._dlq_fd, DLQ_HEADER)
+                start = os.fstat(self._dlq_fd).st_size
+                _write_all(self._dlq_fd, buffer)
+                count = sum(map(len, buffer)) // DLQ_RECORD.size
+                log.info("✓ Saved %d measurement(s) to dead letter queue: %s", count, self.dead_letter_path)
+            except Exception as e:
+                log.error("✗ Failed to write to dead letter queue: %s", e)
+                if start is not None:
+                    # Cut off whatever part of the buffer did get written, so the
+                    # next flush neither duplicates records nor lands after a
+                    # partial one (which would shift every record behind it)
+                    try:
+                        os.ftruncate(self._dlq_fd, start)
+                    except OSError as e:
+                        log.error("✗ Failed to roll back partial dead letter queue write: %s", e)
+                # Put the records back in front of anything buffered since, for the next flush
+                with self._dlq_lock:
+                    self._dlq_buffer[:0] = buffer
+    
+    def _close_dlq(self):
+        """Close the dead letter queue file descriptor (reopened on the next write)."""
+        with self._dlq_write_lock:
+            if self._dlq_fd is not None:
+                os.close(self._dlq_fd)
+                self._dlq_fd = None
+    
+    def _flush_and_close_dlq(self):
+        """Write out buffered dead letter records, then close the file (also run at exit)."""
+        self.flush()
+        self._close_dlq()
+    
+    def _dlq_flush_worker(self):
+        """Write the dead letter buffer every dlq_flush_interval, or sooner once it fills up."""
+        while not self._dlq_stop.is_set():
+            self._dlq_wake.wait(self.dlq_flush_interval)
+            self._dlq_wake.clear()
+            self.flush()
     
     def _retry_worker(self):
         """Background worker that processes the retry queue."""
-        while self.running:
-            try:
-                # Wait for failed measurements (with timeout to allow shutdown)
+        try:
+            while self.running:
                 try:
-                    measurement_data = self.retry_queue.get(timeout=1)
-                except queue.Empty:
-                    continue
-                
-                # Attempt to save to database
-                success = self._retry_save(measurement_data)
-                
-                if success:
-                    print(f"✓ Successfully retried: {measurement_data['tag']} = {measurement_data['value']}")
-                else:
-                    # Increment retry count
-                    measurement_data['retry_count'] += 1
+                    # Retries whose backoff has elapsed come straight off the delay
+                    # heap; only fresh failures go through the shared retry queue
+                    batch, next_ready = self._pop_due(time.monotonic())
+                    n_due = len(batch)
+                    
+                    if not batch:
+                        # Wait for failed measurements, but no longer than the next
+                        # scheduled retry (and with timeout to allow shutdown)
+                        timeout = 1.0
+                        if next_ready is not None:
+                            timeout = min(timeout, max(0.0, next_ready - time.monotonic()))
+                        try:
+                            batch.append(self.retry_queue.get(timeout=timeout))
+                        except queue.Empty:
+                            continue
                     
-                    if measurement_data['retry_count'] < self.max_retries:
-                        # Exponential backoff
-                        backoff = 2 ** measurement_data['retry_count']
-                        time.sleep(backoff)
-                        self.retry_queue.put(measurement_data)
-                        print(f"⚠ Retry {measurement_data['retry_count']}/{self.max_retries} for {measurement_data['tag']}")
+                    # Drain whatever else is already queued into the same batch
+                    while len(batch) < self.batch_size:
+                        try:
+                            batch.append(self.retry_queue.get_nowait())
+                        except queue.Empty:
+                            break
+                    self._add_pending(-sum(map(self._size, batch[n_due:])))
+                    log.debug("⚠ Retrying %d item(s)", len(batch))
+                    
+                    # Attempt to save the whole batch in one transaction
+                    try:
+                        self._save_items(batch)
+                    except Exception as e:
+                        if self._is_row_error(e):
+                            # A row was rejected: retry one at a time so it can't sink the rest
+                            log.warning("✗ Batch retry rejected, retrying %d item(s) separately: %s", len(batch), e)
+                            self._for_each(batch, self._retry_one)
+                        else:
+                            # Database unavailable: back the whole batch off instead
+                            # of hitting it again item by item
+                            log.warning("✗ Batch retry save failed: %s", e)
+                            self._for_each(batch, self._retry_later)
                     else:
-                        # Max retries exceeded - save to dead letter queue
-                        print(f"✗ Max retries exceeded for {measurement_data['tag']} - saving to dead letter queue")
-                        self.save_to_dead_letter_queue(measurement_data)
-                
-                self.retry_queue.task_done()
+                        log.info("✓ Successfully retried %d measurement(s)", sum(map(self._size, batch)))
                 
+                except Exception as e:
+                    log.error("✗ Error in retry worker: %s", e)
+        finally:
+            # The session belongs to this thread, so it is closed here
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+    
+    def _schedule_retry(self, measurement_data: Dict, backoff: float):
+        """Put a measurement on the delay heap to be retried after backoff seconds."""
+        entry = (time.monotonic() + backoff, next(self._delay_seq), measurement_data)
+        self._add_pending(self._size(measurement_data))
+        with self._delay_lock:
+            heapq.heappush(self._delay_heap, entry)
+    
+    def _pop_due(self, now: float):
+        """Pop retries that are due by now. Returns (items, next ready_at or None)."""
+        due = []
+        with self._delay_lock:
+            while self._delay_heap and self._delay_heap[0][0] <= now:
+                due.append(heapq.heappop(self._delay_heap)[2])
+            next_ready = self._delay_heap[0][0] if self._delay_heap else None
+        if due:
+            self._add_pending(-sum(map(self._size, due)))
+        return due, next_ready
+    
+    @staticmethod
+    def _size(measurement_data) -> int:
+        """Number of measurements in a retry item (a dict or a ReadingBatch)."""
+        return len(measurement_data) if isinstance(measurement_data, ReadingBatch) else 1
+    
+    @staticmethod
+    def _is_row_error(e: Exception) -> bool:
+        """True if a save failed because of the rows themselves, not the database."""
+        # Parameter conversion failures come wrapped in a bare StatementError
+        return isinstance(e, _ROW_ERRORS) or type(e) is StatementError
+    
+    @staticmethod
+    def _for_each(batch: List, action):
+        """Apply action to each retry item; one that raises is logged and dropped without losing the rest."""
+        for measurement_data in batch:
+            try:
+                action(measurement_data)
             except Exception as e:
-                print(f"✗ Error in retry worker: {e}")
+                log.error("✗ Dropping retry item that can't be processed: %s", e)
     
-    def _retry_save(self, measurement_data: Dict) -> bool:
-        """
-        Attempt to save a measurement to the database.
+    def _retry_one(self, measurement_data):
+        """Retry a single item on its own, rescheduling or dead-lettering it on failure."""
+        is_batch = isinstance(measurement_data, ReadingBatch)
+        try:
+            self._save_items([measurement_data])
+        except Exception as e:
+            log.debug("✗ Retry save failed: %s", e)
+            if is_batch and len(measurement_data) > 1 and self._is_row_error(e):
+                # A bad row inside a batch: split it so only that row keeps failing
+                records = measurement_data.to_records()
+                for record in records:
+                    record['retry_count'] = measurement_data.retry_count
+                self._for_each(records, self._retry_one)
+            else:
+                self._retry_later(measurement_data)
+            return
         
-        Returns:
-            True if successful, False otherwise
+        if is_batch:
+            log.debug("✓ Successfully retried: batch of %d", len(measurement_data))
+        else:
+            log.debug("✓ Successfully retried: %s = %s", self._tag(measurement_data), measurement_data['value'])
+    
+    def _retry_later(self, measurement_data):
+        """Count a failed attempt, then reschedule the item with backoff or dead-letter it."""
+        is_batch = isinstance(measurement_data, ReadingBatch)
+        label = f"batch of {len(measurement_data)}" if is_batch else self._tag(measurement_data)
+        
+        # Increment retry count
+        if is_batch:
+            measurement_data.retry_count += 1
+            retry_count = measurement_data.retry_count
+        else:
+            measurement_data['retry_count'] += 1
+            retry_count = measurement_data['retry_count']
+        
+        if retry_count < self.max_retries:
+            # Exponential backoff with jitter; scheduled rather than slept so
+            # the worker keeps draining other items in the meantime
+            backoff = min(self.max_backoff, (2 ** retry_count) * random.uniform(0.5, 1.5))
+            self._schedule_retry(measurement_data, backoff)
+            log.debug("⚠ Retry %d/%d for %s", retry_count, self.max_retries, label)
+        else:
+            # Max retries exceeded - save to dead letter queue
+            log.warning("✗ Max retries exceeded for %s - saving to dead letter queue", label)
+            self.save_to_dead_letter_queue(measurement_data)
+    
+    def _save_items(self, batch: List):
+        """
+        Save retry items (dicts or ReadingBatches) with a single commit.
+        Rolls back and re-raises on failure.
         """
         from models import Measurement
         
         session = None
         try:
-            session = self.db_session_factory()
-            
-            # Create measurement
-            measurement = Measurement(
-                timestamp=datetime.fromisoformat(measurement_data['timestamp']),
-                tag=measurement_data['tag'],
-                value=measurement_data['value'],
-                is_anomaly=measurement_data['is_anomaly']
-            )
+            session = self._worker_session()
             
-            session.add(measurement)
+            # Row dicts are only built here, at the database boundary, and
+            # inserted with a single Core executemany (no ORM objects)
+            rows = [row for measurement_data in batch for row in self._rows(measurement_data)]
+            session.execute(insert(Measurement), rows)
             session.commit()
-            return True
-            
-        except Exception as e:
+        
+        except Exception:
             if session:
                 session.rollback()
-            print(f"✗ Retry save failed: {e}")
-            return False
-        finally:
-            if session:
-                session.close()
+            raise
+    
+    def _rows(self, measurement_data) -> List[Dict]:
+        """Insert parameters for a retry item (a dict or a ReadingBatch)."""
+        if isinstance(measurement_data, ReadingBatch):
+            return [
+                {'timestamp': timestamp, 'tag': tag, 'value': value, 'is_anomaly': is_anomaly}
+                for timestamp, tag, value, is_anomaly in zip(
+                    measurement_data.timestamps(),
+                    measurement_data.tags(),
+                    measurement_data.value_list(),
+                    measurement_data.is_anomaly.tolist(),
+                )
+            ]
+        return [{
+            'timestamp': self._timestamp(measurement_data),
+            'tag': self._tag(measurement_data),
+            'value': measurement_data['value'],
+            'is_anomaly': measurement_data['is_anomaly']
+        }]
+    
+    def _worker_session(self):
+        """Return the retry thread's session, creating it on first use."""
+        if self._session is None:
+            self._session = self.db_session_factory()
+        return self._session
+    
+    @staticmethod
+    def _tag(measurement_data: Dict) -> str:
+        """Tag name of a retry record; dead letter files written before 'tag_id' store the name."""
+        if 'tag_id' in measurement_data:
+            return ReadingBatch.TAG_NAMES[measurement_data['tag_id']]
+        return measurement_data['tag']
+    
+    @staticmethod
+    def _timestamp(measurement_data: Dict) -> datetime:
+        """Timestamp of a retry record; dead letter files written before 'ts_us' use ISO strings."""
+        if 'ts_us' in measurement_data:
+            return from_us(measurement_data['ts_us'])
+        return datetime.fromisoformat(measurement_data['timestamp'])
     
     def recover_from_dead_letter_queue(self):
         """
         Attempt to recover measurements from the dead letter queue.
         Call this on startup to replay failed measurements.
-        """
-        if not self.dead_letter_path.exists():
-            return
         
-        print(f"\n📂 Recovering failed measurements from {self.dead_letter_path}...")
+        Also migrates a JSON-lines dead letter file left by older versions
+        (same name with a .jsonl suffix): its records are replayed the same way.
+        """
+        legacy_path = self.dead_letter_path.with_suffix('.jsonl')
+        for path in dict.fromkeys((legacy_path, self.dead_letter_path)):
+            if path.exists():
+                self._recover_file(path)
+    
+    def _recover_file(self, path: Path):
+        """Replay one dead letter file, then remove it (or back it up if anything is still pending)."""
+        log.info("📂 Recovering failed measurements from %s...", path)
         
         recovered = 0
         failed = 0
         
-        # Read all failed measurements
-        with open(self.dead_letter_path, 'r') as f:
-            for line in f:
-                try:
-                    measurement_data = json.loads(line.strip())
-                    # Reset retry count
-                    measurement_data['retry_count'] = 0
-                    
-                    # Try to save immediately
-                    if self._retry_save(measurement_data):
-                        recovered += 1
-                    else:
-                        # Add back to retry queue
-                        self.retry_queue.put(measurement_data)
-                        failed += 1
-                except Exception as e:
-                    print(f"✗ Error recovering measurement: {e}")
+        # Insert in batches, one transaction per batch
+        batch = []
+        try:
+            for measurement_data in read_dead_letter_file(path):
+                if measurement_data is None:
                     failed += 1
+                    continue
+                # Reset retry count
+                measurement_data['retry_count'] = 0
+                batch.append(measurement_data)
+                
+                if len(batch) >= self.recover_batch_size:
+                    if self._bulk_recover(batch):
+                        recovered += len(batch)
+                    else:
+                        failed += len(batch)
+                    batch = []
+        except ValueError as e:
+            # Unreadable header: keep the file as a backup rather than failing startup
+            log.error("✗ Error recovering measurements: %s", e)
+            failed += 1
+        
+        if batch:
+            if self._bulk_recover(batch):
+                recovered += len(batch)
+            else:
+                failed += len(batch)
+        
+        # The file is about to be removed or renamed; later writes go to a new one
+        self._close_dlq()
         
         # Clear the dead letter queue if all recovered
         if failed == 0:
-            self.dead_letter_path.unlink()
-            print(f"✓ Recovered {recovered} measurements and cleared dead letter queue")
+            path.unlink()
+            log.info("✓ Recovered %d measurements and cleared dead letter queue", recovered)
         else:
             # Keep file but create backup
-            backup_path = self.dead_letter_path.with_suffix('.jsonl.backup')
-            self.dead_letter_path.rename(backup_path)
-            print(f"✓ Recovered {recovered} measurements, {failed} still pending")
-            print(f"  Original file backed up to: {backup_path}")
+            backup_path = path.with_name(path.name + '.backup')
+            path.rename(backup_path)
+            log.info("✓ Recovered %d measurements, %d still pending", recovered, failed)
+            log.info("  Original file backed up to: %s", backup_path)
+    
+    def _bulk_recover(self, batch: List[Dict]) -> bool:
+        """
+        Insert a batch of dead letter records in one transaction.
+        If that fails, the records are added back to the retry queue.
+        
+        Returns:
+            True if the batch was saved, False if it was queued for retry
+        """
+        from models import Measurement
+        
+        session = None
+        try:
+            session = self.db_session_factory()
+            rows = [row for measurement_data in batch for row in self._rows(measurement_data)]
+            session.execute(insert(Measurement), rows)
+            session.commit()
+            return True
+        
+        except Exception as e:
+            if session:
+                session.rollback()
+            log.warning("✗ Bulk recovery of %d measurement(s) failed: %s", len(batch), e)
+            # Add back to retry queue
+            for measurement_data in batch:
+                self._enqueue(measurement_data)
+            return False
+        finally:
+            if session:
+                session.close()
 
 
 # Global handler instance (initialized in api.py)
@@ -2,17 +2,28 @@
 Fermenter data simulator.
 Generates realistic time-series data for fermenter process tags.
 """
-import random
 import time
 import math
-from datetime import datetime
+import numpy as np
 from typing import Dict, List
 
+from readings import ReadingBatch, ReadingRing, to_us
+from _simulator_jit import gen
+
 
 class SensorSimulator:
     """Simulates fermenter sensor data with various patterns."""
     
-    def __init__(self):
+    # Ticks generated per callback when simulating without a delay
+    BULK_STEPS = 1000
+    
+    def __init__(self, seed=None):
+        """
+        Initialize the simulator.
+        
+        Args:
+            seed: Seed for the random generator (None for nondeterministic output)
+        """
         self.tags_config = {
             'fermenter_temp': {
                 'description': 'Fermenter temperature',
@@ -43,6 +54,35 @@ class SensorSimulator:
             },
         }
         self.time_step = 0
+        
+        # Per-tag parameters as arrays, in tags_config order, for batch generation
+        configs = self.tags_config.values()
+        self._names = list(self.tags_config)
+        self._tag_ids = np.array([ReadingBatch.TAG_ID[name] for name in self._names], dtype=np.uint8)
+        self._base = np.array([c['base_value'] for c in configs])
+        self._var = np.array([c['variation'] for c in configs])
+        self._min = np.array([c['min_value'] for c in configs]) - self._var
+        self._max = np.array([c['max_value'] for c in configs]) + self._var
+        self._p_anom = np.array([c['anomaly_probability'] for c in configs])
+        self._sine_amp = self._var * 0.5
+        self._noise_sd = self._var * 0.2
+        self._rng = np.random.default_rng(seed)
+        
+        # Every generated batch is also written here for downstream consumers
+        self.ring = ReadingRing()
+        
+        # Noise and anomaly draws for the next _anom_batch ticks of
+        # generate_batch, prefilled in bulk and consumed one row per tick
+        self._anom_batch = 4096
+        self._refill_anom()
+        
+        # Per-tag parameters unpacked once for generate_reading:
+        # (base, variation, min bound, max bound, anomaly probability)
+        self._params = {
+            name: (c['base_value'], c['variation'], c['min_value'] - c['variation'],
+                   c['max_value'] + c['variation'], c['anomaly_probability'])
+            for name, c in self.tags_config.items()
+        }
     
     def get_tags_metadata(self) -> List[Dict]:
         """Return metadata for all simulated tags."""
@@ -58,61 +98,135 @@ class SensorSimulator:
         ]
     
     def generate_reading(self, tag_name: str) -> Dict:
-        """Generate a single reading for a specific tag."""
-        if tag_name not in self.tags_config:
+        """
+        Generate a single reading for a specific tag.
+        
+        Returns:
+            Dict with 'ts_us' (int microseconds since the epoch), 'tag_id'
+            (index into ReadingBatch.TAG_NAMES) and 'value'
+        """
+        params = self._params.get(tag_name)
+        if params is None:
             raise ValueError(f"Unknown tag: {tag_name}")
         
-        config = self.tags_config[tag_name]
+        # Draw the random inputs here; the arithmetic (sine wave, noise,
+        # anomaly spike/drop, clamping) runs in the compiled kernel
+        base, variation, min_bound, max_bound, anomaly_probability = params
+        rng = self._rng
+        u1, u2, u3 = rng.random(3).tolist()
+        value = gen(self.time_step, base, variation, min_bound, max_bound, anomaly_probability,
+                    rng.standard_normal(), u1, u2, u3)
+        
+        return {
+            'ts_us': time.time_ns() // 1000,
+            'tag_id': ReadingBatch.TAG_ID[tag_name],
+            'value': round(float(value), 2),
+        }
+    
+    def generate_batch(self) -> ReadingBatch:
+        """Generate readings for all tags (same model as generate_reading, vectorized)."""
+        if self._anom_idx >= self._anom_batch:
+            self._refill_anom()
+        row = self._offsets[self._anom_idx]
+        self._anom_idx += 1
+        self.time_step += 1
+        
+        # Base value + time-based sine wave + prefilled noise/anomaly offset
+        values = self._base + math.sin(self.time_step * 0.1) * self._sine_amp + row
         
-        # Base value with sinusoidal variation over time
-        base = config['base_value']
-        variation = config['variation']
+        # Clamp to reasonable bounds (but allow some out-of-range for detection)
+        values = np.round(np.clip(values, self._min, self._max), 2)
+        return self._to_batch(values[None, :])
+    
+    def _refill_anom(self):
+        """Draw noise and anomaly spikes/drops for the next _anom_batch ticks in one go."""
+        shape = (self._anom_batch, len(self._names))
+        rng = self._rng
+        anomaly = rng.random(shape) < self._p_anom
+        spike = rng.random(shape) < 0.5
+        size = rng.random(shape)
+        # Spikes add 3-5 x variation, drops subtract 2-4 x variation
+        jump = np.where(spike, 3.0 + 2.0 * size, -(2.0 + 2.0 * size)) * self._var
+        self._offsets = rng.standard_normal(shape) * self._noise_sd + np.where(anomaly, jump, 0.0)
+        self._anom_idx = 0
+    
+    def generate_bulk(self, n_steps: int) -> np.ndarray:
+        """
+        Generate n_steps consecutive ticks for all tags in one vectorized pass.
         
-        # Add time-based sine wave for realistic patterns
-        sine_component = math.sin(self.time_step * 0.1) * variation * 0.5
+        Args:
+            n_steps: Number of ticks to generate
         
-        # Add random noise
-        noise = random.gauss(0, variation * 0.2)
+        Returns:
+            Array of shape (n_steps, number of tags), columns in tags_config order
+        """
+        shape = (n_steps, len(self._names))
+        rng = self._rng
+        t = np.arange(self.time_step + 1, self.time_step + 1 + n_steps)[:, None]
+        self.time_step += n_steps
         
-        # Calculate value
-        value = base + sine_component + noise
+        # Base value + time-based sine wave + random noise
+        sine = np.sin(t * 0.1) * self._sine_amp
+        noise = rng.standard_normal(shape) * self._noise_sd
+        values = self._base + sine + noise
         
-        # Occasionally inject anomalies
-        if random.random() < config['anomaly_probability']:
-            # Create an anomaly (spike or drop)
-            if random.random() < 0.5:
-                value += variation * random.uniform(3, 5)  # Spike
-            else:
-                value -= variation * random.uniform(2, 4)  # Drop
+        # Occasionally inject anomalies (spike or drop)
+        anomaly = rng.random(shape) < self._p_anom
+        spike = rng.random(shape) < 0.5
+        values = np.where(anomaly & spike, values + self._var * rng.uniform(3, 5, shape), values)
+        values = np.where(anomaly & ~spike, values - self._var * rng.uniform(2, 4, shape), values)
         
         # Clamp to reasonable bounds (but allow some out-of-range for detection)
-        min_bound = config['min_value'] - variation
-        max_bound = config['max_value'] + variation
-        value = max(min_bound, min(max_bound, value))
-        
-        return {
-            'timestamp': datetime.utcnow().isoformat(),
-            'tag': tag_name,
-            'value': round(value, 2),
-        }
+        return np.round(np.clip(values, self._min, self._max), 2)
     
-    def generate_batch(self) -> List[Dict]:
-        """Generate readings for all tags."""
-        self.time_step += 1
-        return [self.generate_reading(tag_name) for tag_name in self.tags_config.keys()]
+    def _to_batch(self, values: np.ndarray, start_us=None, step_us=0) -> ReadingBatch:
+        """
+        Convert generate_bulk output to a ReadingBatch and add it to the ring.
+        
+        Args:
+            values: Array of shape (n_steps, number of tags)
+            start_us: Timestamp of the first row, microseconds since the epoch (None for now)
+            step_us: Time between consecutive rows in microseconds
+        """
+        n_steps, n_tags = values.shape
+        if start_us is None:
+            start_us = time.time_ns() // 1000
+        ts = (start_us + np.arange(n_steps, dtype=np.int64) * step_us).repeat(n_tags)
+        batch = ReadingBatch(
+            ts=ts,
+            tag_ids=np.tile(self._tag_ids, n_steps),
+            values=values.ravel(),
+        )
+        self.ring.write(batch)
+        return batch
     
-    def simulate_continuous(self, callback, interval_seconds=1, max_iterations=None):
+    def simulate_continuous(self, callback, interval_seconds=1, max_iterations=None,
+                            start_time=None, tick_seconds=1.0):
         """
         Continuously generate readings and call the callback function.
         
         Args:
-            callback: Function to call with each batch of readings
-            interval_seconds: Time between readings
+            callback: Function to call with each ReadingBatch
+            interval_seconds: Time between readings (0 generates BULK_STEPS ticks per callback)
             max_iterations: Maximum number of iterations (None for infinite)
+            start_time: Timestamp of the first tick when interval_seconds is 0 (None for now)
+            tick_seconds: Simulated time between ticks when interval_seconds is 0
         """
         iteration = 0
+        step_us = int(tick_seconds * 1_000_000)
+        next_us = to_us(start_time) if start_time is not None else time.time_ns() // 1000
         try:
             while max_iterations is None or iteration < max_iterations:
+                if interval_seconds == 0:
+                    # No pacing (backfill/replay): generate many ticks at once,
+                    # stamped tick_seconds apart and continuing across callbacks
+                    steps = self.BULK_STEPS
+                    if max_iterations is not None:
+                        steps = min(steps, max_iterations - iteration)
+                    callback(self._to_batch(self.generate_bulk(steps), next_us, step_us))
+                    next_us += steps * step_us
+                    iteration += steps
+                    continue
                 readings = self.generate_batch()
                 callback(readings)
                 iteration += 1
@@ -134,6 +248,6 @@ if __name__ == '__main__':
     for i in range(5):
         readings = simulator.generate_batch()
         print(f"\nBatch {i+1}:")
-        for reading in readings:
+        for reading in readings.to_dicts():
             print(f"  {reading['tag']}: {reading['value']}")
         time.sleep(0.5)